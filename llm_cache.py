@@ -0,0 +1,105 @@
+"""Content-addressed cache for LLM responses that survives between runs."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+
+class FileBackend:
+    """Stores each cache entry as a JSON file named after its key."""
+
+    def __init__(self, directory: str, max_entries: int = 1000):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry, or None if it is missing or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Touch the file so eviction removes the least recently used entries
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def write(self, key: str, entry: Dict[str, Any]):
+        """Store an entry atomically, evicting old entries beyond max_entries."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temp file and rename so concurrent readers never see half a file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def delete(self, key: str):
+        """Remove an entry if it exists."""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop the least recently used entries once the directory is over capacity."""
+        try:
+            paths = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+        except OSError:
+            return
+        if len(paths) <= self.max_entries:
+            return
+
+        def last_used(path: str) -> float:
+            try:
+                return os.path.getmtime(path)
+            except OSError:
+                return 0.0
+
+        paths.sort(key=last_used)
+        for path in paths[:len(paths) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class LLMCache:
+    """Response cache keyed by a SHA-256 digest of everything that shaped the response."""
+
+    def __init__(self, backend: FileBackend, ttl: float = 86400):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Hash the request parts (model, prompt, ...) into a stable key."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None if it is missing or older than the TTL."""
+        entry = self.backend.read(key)
+        if entry is None:
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self.backend.delete(key)
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: str):
+        """Store a value under key."""
+        self.backend.write(key, {"created": time.time(), "value": value})
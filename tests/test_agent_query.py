@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import travel
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Chat:
+    """Chat stub: streams the first reply in small chunks, then answers the function results."""
+
+    def __init__(self, first_reply):
+        self.first_reply = first_reply
+        self.history = []
+
+    def send_message(self, message, stream=False):
+        self.history.append(message)
+        text = "final answer" if message.startswith("Function Results") else self.first_reply
+        if stream:
+            return [_Response(text[i:i + 7]) for i in range(0, len(text), 7)]
+        return _Response(text)
+
+
+class _Model:
+    def __init__(self, first_reply):
+        self.first_reply = first_reply
+
+    def start_chat(self, history=None):
+        return _Chat(self.first_reply)
+
+
+class StreamedQueryTest(unittest.TestCase):
+    def run_query(self, first_reply):
+        agent = travel.WeatherAgent()
+        tool_result = {"recommendations": "May"}
+        with mock.patch.object(travel.BaseAgent, "model", _Model(first_reply)), \
+                mock.patch.object(travel, "_run_gemini_tool", return_value=tool_result), \
+                mock.patch.object(travel, "AGENT_LOG_DIR", None):
+            answer = agent.query("When should I go?")
+        return agent, answer
+
+    def test_call_after_malformed_directive_still_runs(self):
+        agent, answer = self.run_query(
+            "CALL_FUNCTION: analyze_weather_and_seasons(location=Xi'an) "
+            'CALL_FUNCTION: recommend_best_travel_dates(location="Paris")'
+        )
+        self.assertEqual(answer, "final answer")
+        self.assertEqual(agent.history["call_count"], 1)
+        self.assertEqual(agent.history["calls"][0]["function"], "recommend_best_travel_dates")
+
+    def test_each_streamed_call_runs_once(self):
+        agent, answer = self.run_query(
+            'CALL_FUNCTION: analyze_weather_and_seasons(location="Paris", travel_month="June") '
+            'CALL_FUNCTION: recommend_best_travel_dates(location="Paris")'
+        )
+        self.assertEqual(answer, "final answer")
+        self.assertEqual(
+            sorted(call["function"] for call in agent.history["calls"]),
+            ["analyze_weather_and_seasons", "recommend_best_travel_dates"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import FileBackend, LLMCache
+
+
+class LLMCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+
+    def make_cache(self, **kwargs):
+        max_entries = kwargs.pop("max_entries", 1000)
+        return LLMCache(FileBackend(self.directory, max_entries=max_entries), **kwargs)
+
+    def test_round_trip(self):
+        cache = self.make_cache()
+        key = LLMCache.make_key(model="m", prompt="p")
+        cache.set(key, "answer")
+        self.assertEqual(cache.get(key), "answer")
+
+    def test_key_ignores_argument_order(self):
+        self.assertEqual(LLMCache.make_key(model="m", prompt="p"), LLMCache.make_key(prompt="p", model="m"))
+        self.assertNotEqual(LLMCache.make_key(model="m", prompt="p"), LLMCache.make_key(model="m", prompt="q"))
+
+    def test_entry_past_ttl_is_dropped(self):
+        cache = self.make_cache(ttl=60)
+        cache.set("k", "old")
+        with mock.patch("llm_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(cache.get("k"))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "k.json")))
+
+    def test_eviction_keeps_most_recently_used(self):
+        cache = self.make_cache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        # Give the entries distinct ages, then read "a" so "b" is the least recently used
+        os.utime(os.path.join(self.directory, "a.json"), (1000, 1000))
+        os.utime(os.path.join(self.directory, "b.json"), (2000, 2000))
+        self.assertEqual(cache.get("a"), "1")
+        cache.set("c", "3")
+        self.assertEqual(sorted(os.listdir(self.directory)), ["a.json", "c.json"])
+        self.assertIsNone(cache.get("b"))
+
+    def test_missing_entry(self):
+        self.assertIsNone(self.make_cache().get("absent"))
+
+    def test_unreadable_entry(self):
+        with open(os.path.join(self.directory, "k.json"), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertIsNone(self.make_cache().get("k"))
+
+    def test_write_failure_leaves_no_temp_file(self):
+        cache = self.make_cache()
+        with mock.patch("llm_cache.os.replace", side_effect=OSError):
+            cache.set("k", "v")
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from travel import _scan_calls
+
+
+def calls(text, **kwargs):
+    return [(name, params) for name, params, _ in _scan_calls(text, **kwargs)]
+
+
+class ScanCallsTest(unittest.TestCase):
+    def test_single_call(self):
+        self.assertEqual(
+            calls('CALL_FUNCTION: analyze(location="Paris", travel_month="June")'),
+            [("analyze", 'location="Paris", travel_month="June"')],
+        )
+
+    def test_nested_parens_and_quoted_parens_are_kept(self):
+        self.assertEqual(
+            calls('CALL_FUNCTION: f(a=(1, 2), b=")", c=g(3))'),
+            [("f", 'a=(1, 2), b=")", c=g(3)')],
+        )
+
+    def test_several_calls_and_end_offsets(self):
+        text = 'CALL_FUNCTION: f(a=1) then CALL_FUNCTION: g(b=[1, 2])'
+        scanned = list(_scan_calls(text))
+        self.assertEqual([(name, params) for name, params, _ in scanned], [("f", "a=1"), ("g", "b=[1, 2]")])
+        self.assertEqual(scanned[-1][2], len(text))
+
+    def test_marker_in_prose_is_skipped(self):
+        self.assertEqual(calls("Use CALL_FUNCTION: to call. CALL_FUNCTION: f(x=1)"), [("f", "x=1")])
+
+    def test_partial_buffer_stops_at_cut_off_directive(self):
+        text = 'CALL_FUNCTION: f(a=1) CALL_FUNCTION: g(b="unfinished'
+        self.assertEqual(calls(text), [("f", "a=1")])
+
+    def test_scan_resumes_from_offset(self):
+        text = 'CALL_FUNCTION: f(a=1) CALL_FUNCTION: g(b=2)'
+        first_end = next(_scan_calls(text))[2]
+        self.assertEqual(calls(text, pos=first_end), [("g", "b=2")])
+
+    def test_complete_text_skips_malformed_directive(self):
+        text = "CALL_FUNCTION: f(loc=Xi'an) CALL_FUNCTION: g(c=1)"
+        self.assertEqual(calls(text), [])
+        self.assertEqual(calls(text, complete=True), [("g", "c=1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
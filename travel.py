@@ -1,15 +1,30 @@
-import google.generativeai as genai
-from typing import List, Dict, Callable, Any, Optional
+import asyncio
+from typing import List, Dict, Callable, Any, Iterator, Optional, TypedDict, get_args, get_origin, get_type_hints
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 import os
+import sys
 import json
 import re
+import ast
 import inspect
-from dataclasses import dataclass
+import functools
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 
-# Load environment variables
-load_dotenv()
+from llm_cache import FileBackend, LLMCache
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib json module works the same
+    orjson = None
+
+# Load environment variables from .env unless the key is already set
+if not os.environ.get("GEMINI_API_KEY"):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # API Keys
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -17,21 +32,411 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment. Check your .env file.")
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+MODEL_NAME = "gemini-2.5-flash"
+
+# Defaults for every request; empty keeps Gemini's own sampling settings
+GENERATION_CONFIG = {}
+
+@functools.cache
+def _model():
+    """Shared model instance; generate_content calls are stateless so one is enough."""
+    # Imported on first use: the SDK pulls in gRPC and protobuf, which would
+    # otherwise delay startup even when no request is ever sent
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(MODEL_NAME, generation_config=GENERATION_CONFIG)
+
+# Responses persisted across runs; only used for requests that run at temperature 0
+LLM_CACHE = LLMCache(FileBackend("./.llm_cache"), ttl=86400)
+
+# Every agent function call is appended here as JSON lines, one file per agent;
+# set to None to keep only the in-memory history
+AGENT_LOG_DIR = "./.agent_logs"
+
+# Matches CALL_FUNCTION: name(params) directives in model output; only used
+# when _USE_REGEX_CALL_PARSER is set, otherwise _scan_calls does the work
+_CALL_FUNCTION_RE = re.compile(r'CALL_FUNCTION:\s*(\w+)\((.*?)\)', re.DOTALL)
+_USE_REGEX_CALL_PARSER = False
+_CALL_FUNCTION_MARKER = "CALL_FUNCTION:"
+
+# Longest function result passed back to the model in a follow-up turn
+_MAX_FUNCTION_RESULT_CHARS = 8000
+
+def _dumps(obj: Any) -> str:
+    """Serialize to compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
+
+# Number of recent calls and responses each agent keeps in its history
+_HISTORY_LIMIT = 256
+
+# Splits "a=1, b=[2, 3]" on the commas that start a new keyword argument
+_PARAM_SPLIT_RE = re.compile(r',\s*(?=\w+\s*=)')
+
+# Splits a comma-separated answer and strips the items in one pass
+_CSV_SPLIT_RE = re.compile(r'\s*,\s*')
+
+# Recent responses keyed by prompt and generation config; tool prompts are
+# deterministic templates
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_TTL = 3600  # seconds
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def _cache_key(prompt: str, generation_config: Optional[Dict]) -> tuple:
+    """Key a response by everything that determines it."""
+    return prompt, repr(generation_config)
+
+def _is_deterministic(generation_config: Optional[Dict] = None) -> bool:
+    """Whether a request runs at temperature 0, so its answer is safe to reuse across runs."""
+    return {**GENERATION_CONFIG, **(generation_config or {})}.get("temperature") == 0
+
+def _persistent_get(key: str, generation_config: Optional[Dict] = None) -> Optional[str]:
+    """Read from the on-disk cache when it is enabled for this request."""
+    if LLM_CACHE is None or not _is_deterministic(generation_config):
+        return None
+    return LLM_CACHE.get(key)
+
+def _persistent_set(key: str, text: str, generation_config: Optional[Dict] = None):
+    """Write to the on-disk cache when it is enabled for this request."""
+    if LLM_CACHE is not None and _is_deterministic(generation_config):
+        LLM_CACHE.set(key, text)
+
+def _persistent_key(key: tuple) -> str:
+    """Content address of an in-memory cache key."""
+    prompt, generation_config = key
+    return LLMCache.make_key(model=MODEL_NAME, prompt=prompt, config=generation_config)
+
+def _remember(key: tuple, text: str):
+    """Store a response in memory, evicting the least recently used entries."""
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), text)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > _RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+def _cache_lookup(key: tuple, generation_config: Optional[Dict] = None) -> Optional[str]:
+    """Return a response for an identical request from memory or disk, if there is one."""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry and time.monotonic() - entry[0] < _RESPONSE_CACHE_TTL:
+            _response_cache.move_to_end(key)
+            return entry[1]
+    
+    text = _persistent_get(_persistent_key(key), generation_config)
+    if text is not None:
+        _remember(key, text)
+    return text
+
+def _cache_store(key: tuple, text: str, generation_config: Optional[Dict] = None):
+    """Remember a response in memory and on disk."""
+    _remember(key, text)
+    _persistent_set(_persistent_key(key), text, generation_config)
+
+def _cached_generate(prompt: str, generation_config: Optional[Dict] = None) -> str:
+    """Generate text for a prompt, reusing a recent response for an identical request."""
+    key = _cache_key(prompt, generation_config)
+    text = _cache_lookup(key, generation_config)
+    if text is None:
+        # Errors propagate to the caller and are never cached
+        text = _model().generate_content(prompt, generation_config=generation_config).text
+        _cache_store(key, text, generation_config)
+    return text
+
+def _stream_generate(prompt: str, generation_config: Optional[Dict] = None) -> Iterator[str]:
+    """Yield a response in chunks as they are generated, caching the full text."""
+    key = _cache_key(prompt, generation_config)
+    text = _cache_lookup(key, generation_config)
+    if text is not None:
+        yield text
+        return
+    
+    chunks = []
+    for chunk in _model().generate_content(prompt, generation_config=generation_config, stream=True):
+        chunks.append(chunk.text)
+        yield chunk.text
+    _cache_store(key, "".join(chunks), generation_config)
+
+def _print_stream(chunks: Iterator[str]) -> str:
+    """Print text as it arrives and return all of it."""
+    printed = []
+    for chunk in chunks:
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+        printed.append(chunk)
+    sys.stdout.write("\n")
+    return "".join(printed)
+
+class BatchGeminiClient:
+    """Concurrency- and rate-limited gateway for async Gemini requests."""
+    
+    def __init__(self, max_concurrency: int = 8, rate_limit_rpm: int = 300):
+        self.max_concurrency = max_concurrency
+        self.rate_limit_rpm = rate_limit_rpm
+        self._loop = None
+        self._semaphore = None
+        self._rate_lock = None
+        self._sent = deque()
+        self._in_flight = {}
+    
+    def _bind_loop(self):
+        """Create the asyncio primitives for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Each asyncio.run() starts a new loop; primitives cannot be shared across loops
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._rate_lock = asyncio.Lock()
+            self._in_flight = {}
+    
+    async def _throttle(self):
+        """Wait until sending another request stays within the per-minute limit."""
+        async with self._rate_lock:
+            now = time.monotonic()
+            while self._sent and now - self._sent[0] >= 60:
+                self._sent.popleft()
+            if len(self._sent) >= self.rate_limit_rpm:
+                await asyncio.sleep(60 - (now - self._sent[0]))
+                self._sent.popleft()
+            self._sent.append(time.monotonic())
+    
+    async def submit(self, func: Callable, /, *args, **kwargs) -> Any:
+        """Await func(*args, **kwargs) once a concurrency and rate-limit slot is free."""
+        self._bind_loop()
+        async with self._semaphore:
+            await self._throttle()
+            return await func(*args, **kwargs)
+    
+    async def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
+        """Generate text for a single prompt, sharing the response cache with the sync path.
+        
+        Concurrent callers with an identical request share one in-flight request.
+        """
+        key = _cache_key(prompt, generation_config)
+        # The lookup may read from disk, so keep it off the event loop
+        text = await asyncio.to_thread(_cache_lookup, key, generation_config)
+        if text is not None:
+            return text
+        
+        self._bind_loop()
+        # No await between the lookup and the insert, so this is atomic on the loop
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_uncached(key, prompt, generation_config))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the request for the others
+        return await asyncio.shield(task)
+    
+    async def _generate_uncached(self, key: tuple, prompt: str, generation_config: Optional[Dict]) -> str:
+        """Send a prompt to Gemini and cache the response."""
+        response = await self.submit(_model().generate_content_async, prompt, generation_config=generation_config)
+        text = response.text
+        await asyncio.to_thread(_cache_store, key, text, generation_config)
+        return text
+
+# Shared by every async agent so concurrent specialists respect one limit
+BATCH_CLIENT = BatchGeminiClient()
+
+class _DaemonExecutor:
+    """Bounded executor whose workers are daemon threads.
+    
+    ThreadPoolExecutor workers are joined at interpreter exit, so quitting
+    would wait for any tool call still generating; these are not.
+    """
+    
+    def __init__(self, max_workers: int):
+        self._slots = threading.BoundedSemaphore(max_workers)
+    
+    def submit(self, func: Callable, /, *args, **kwargs) -> Future:
+        """Run func(*args, **kwargs) on a daemon thread once a worker slot is free."""
+        future = Future()
+        
+        def run():
+            with self._slots:
+                # Cancelled while waiting for a slot
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        
+        threading.Thread(target=run, daemon=True).start()
+        return future
 
-@dataclass
+# Runs function calls while the model is still streaming the rest of its response
+_EXECUTOR = _DaemonExecutor(max_workers=8)
+
+@functools.lru_cache(maxsize=32)
+def _trip_context(from_location: str, to_location: str, duration_days: int,
+                  budget_range: str, interests: tuple) -> str:
+    """Build the trip summary once per distinct set of trip details."""
+    # Keyed by value rather than cached on the instance, since the request is
+    # filled in field by field while the user answers
+    return (f"Trip from {from_location} to {to_location}, {duration_days} days, "
+            f"budget {budget_range}, interests {', '.join(interests)}.")
+
+@dataclass(slots=True)
 class TravelRequest:
     from_location: str = ""
     to_location: str = ""
-    preferred_dates: List[str] = None
+    preferred_dates: List[str] = field(default_factory=list)
     flexible_dates: bool = False
     duration_days: int = 0
     time_preference: str = ""  # day/night/mixed
-    interests: List[str] = None
+    interests: List[str] = field(default_factory=list)
     budget_range: str = ""  # low/medium/high
     accommodation_type: str = ""  # hotel/hostel/apartment
     transport_preference: str = ""  # flight/train/car
+    
+    @property
+    def context_blurb(self) -> str:
+        """One-sentence summary of the trip that agent prompts start with."""
+        return _trip_context(self.from_location, self.to_location, self.duration_days,
+                             self.budget_range, tuple(self.interests or ()))
+
+def _scan_calls(text: str, pos: int = 0, complete: bool = False):
+    """Yield (name, params, end offset) for each complete CALL_FUNCTION directive.
+    
+    Single left-to-right pass: the parameter list runs to the matching close
+    paren, so nested calls, tuples and quoted parens are kept intact. In a
+    partial (streaming) buffer, scanning stops at a directive that is cut off
+    by the end of the text; when the text is complete such a directive is
+    malformed and skipped so the ones after it are still found.
+    """
+    length = len(text)
+    while (start := text.find(_CALL_FUNCTION_MARKER, pos)) != -1:
+        i = start + len(_CALL_FUNCTION_MARKER)
+        while i < length and text[i].isspace():
+            i += 1
+        name_start = i
+        while i < length and (text[i].isalnum() or text[i] == '_'):
+            i += 1
+        if i == length:
+            return
+        if i == name_start or text[i] != '(':
+            # Not a call, e.g. the marker mentioned in prose
+            pos = i
+            continue
+        
+        depth = 0
+        quote = None
+        end = -1
+        j = i
+        while j < length:
+            char = text[j]
+            if quote:
+                if char == '\\':
+                    j += 1
+                elif char == quote:
+                    quote = None
+            elif char in '"\'':
+                quote = char
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    end = j
+                    break
+            j += 1
+        
+        if end == -1:
+            if not complete:
+                return
+            pos = i + 1
+            continue
+        yield text[name_start:i], text[i + 1:end], end + 1
+        pos = end + 1
+
+@dataclass(frozen=True)
+class ToolSchema:
+    """Signature details of a tool, resolved once when an agent is built."""
+    params: tuple  # (parameter name, annotation name) pairs
+    description: str
+
+def _describe_tool(func: Callable) -> ToolSchema:
+    """Resolve a tool's signature and render its description for the prompt."""
+    params = []
+    for param_name, param in inspect.signature(func).parameters.items():
+        param_type = getattr(param.annotation, '__name__', str(param.annotation)) if param.annotation != param.empty else "any"
+        params.append((param_name, param_type))
+    
+    doc = func.__doc__ or "No description available"
+    signature = ", ".join(f"{param_name}: {param_type}" for param_name, param_type in params)
+    description = f"Function: {func.__name__}({signature})\nDescription: {doc}"
+    
+    # Advertise structured results so the model can refer to fields directly
+    response_schema = getattr(func, "response_schema", None)
+    if response_schema is not None:
+        description += f"\nReturns: {{{func.response_field}: {_describe_type(response_schema)}, ...inputs}}"
+    return ToolSchema(tuple(params), description)
+
+def _describe_type(hint: Any) -> str:
+    """Render a response schema type compactly, e.g. {month: str, tips: [str]}."""
+    if hasattr(hint, "__required_keys__"):
+        fields = ", ".join(f"{name}: {_describe_type(field)}" for name, field in get_type_hints(hint).items())
+        return f"{{{fields}}}"
+    if get_origin(hint) is list:
+        return f"[{_describe_type(get_args(hint)[0])}]"
+    return getattr(hint, '__name__', str(hint))
+
+def _has_error(results: List[Any]) -> bool:
+    """Whether any function result is an error dict."""
+    return any(isinstance(result, dict) and "error" in result for result in results)
+
+def _generation_error(e: Exception) -> str:
+    return f"Error generating response: {str(e)}"
+
+_MAX_ITERATIONS_REACHED = "Maximum iterations reached. Please try a simpler request."
+
+class _Query:
+    """Bookkeeping shared by BaseAgent.query and query_async.
+    
+    The two only differ in how they send a turn and run its function calls.
+    """
+    
+    def __init__(self, agent: "BaseAgent", prompt: str, max_iterations: int):
+        self.agent = agent
+        self.message = f"{agent._prompt_prefix}\n\nUser: {prompt}"
+        # Identical requests to a deterministic model give identical answers
+        self.cache_key = LLMCache.make_key(model=MODEL_NAME, prompt=self.message, max_iterations=max_iterations)
+        self.answer = None
+        # An answer built on a failed function call is returned but not cached
+        self.function_failed = False
+    
+    # Agent chats run with GENERATION_CONFIG, which is empty by default, so
+    # cached() and store() are no-ops unless it sets temperature to 0
+    def cached(self) -> Optional[str]:
+        """The disk-cached answer to an identical earlier query, if any."""
+        return _persistent_get(self.cache_key)
+    
+    def take_reply(self, response_text: str, function_calls: List[Dict], results: List[Any]) -> bool:
+        """Take in a model reply and its function results; True while another turn is needed."""
+        self.agent.history["responses"].append(response_text)
+        if not function_calls:
+            self.answer = response_text
+            return False
+        
+        self.function_failed = self.function_failed or _has_error(results)
+        function_results = [
+            self.agent._format_function_result(call["function"], result)
+            for call, result in zip(function_calls, results)
+        ]
+        # Send the results as the next turn of the chat
+        self.message = (
+            "Function Results:\n" + "\n".join(function_results) + "\n\n"
+            "Based on the function results above, provide a comprehensive response to the original request."
+        )
+        return True
+    
+    def store(self) -> str:
+        """Cache the final answer unless it rests on a failed function call, and return it."""
+        if not self.function_failed:
+            _persistent_set(self.cache_key, self.answer)
+        return self.answer
 
 class BaseAgent:
     """Base agent class with common functionality."""
@@ -40,24 +445,60 @@ class BaseAgent:
         self.name = name
         self.system_prompt = system_prompt
         self.tools = {}
-        self.model = genai.GenerativeModel("gemini-2.5-flash")
-        self.history = {"calls": [], "responses": []}
+        # Bounded so long-running sessions keep a constant memory footprint; the
+        # full call record goes to the agent's log file and call_count
+        self.history = {
+            "calls": deque(maxlen=_HISTORY_LIMIT),
+            "responses": deque(maxlen=_HISTORY_LIMIT),
+            "call_count": 0,
+        }
+        self._log = None
+        self._log_lock = threading.Lock()
         
         for tool in tools:
             self.tools[tool.__name__] = tool
+        
+        # Tools never change after construction, so describe them once
+        self._tool_schema = {name: _describe_tool(func) for name, func in self.tools.items()}
+        self._function_descriptions = "\n\n".join(schema.description for schema in self._tool_schema.values())
+        
+        # Static part of every prompt; only the conversation changes between iterations
+        if not self.tools:
+            self._prompt_prefix = f"System: {self.system_prompt}"
+        else:
+            self._prompt_prefix = f"""System: {self.system_prompt}
+
+Available Functions:
+{self._function_descriptions}
+
+Instructions for function calling:
+- When you need to use a function, write: CALL_FUNCTION: function_name(param1="value1", param2=["item1", "item2"])
+- Use proper Python syntax for parameters
+- After calling functions, provide a comprehensive response"""
+    
+    @property
+    def model(self):
+        """The shared model, created when the agent first sends a request."""
+        return _model()
     
     def _parse_function_calls(self, text: str) -> List[Dict]:
         """Extract function calls from the model's response."""
-        calls = []
-        pattern = r'CALL_FUNCTION:\s*(\w+)\((.*?)\)'
-        matches = re.findall(pattern, text, re.DOTALL)
+        return [call for call, _ in self._iter_function_calls(text, complete=True)]
+    
+    def _iter_function_calls(self, text: str, pos: int = 0, complete: bool = False):
+        """Yield (call, end offset) for each complete function call from pos onwards.
+        
+        complete says the text is a whole response rather than a streaming buffer.
+        """
+        if _USE_REGEX_CALL_PARSER:
+            matches = ((*match.groups(), match.end()) for match in _CALL_FUNCTION_RE.finditer(text, pos))
+        else:
+            matches = _scan_calls(text, pos, complete)
         
-        for func_name, params_str in matches:
+        for func_name, params_str, end in matches:
             if func_name in self.tools:
                 params = self._parse_parameters(params_str)
-                calls.append({"function": func_name, "parameters": params})
-        
-        return calls
+                yield {"function": func_name, "parameters": params}, end
     
     def _parse_parameters(self, params_str: str) -> Dict[str, Any]:
         """Parse function parameters from string."""
@@ -66,12 +507,12 @@ class BaseAgent:
             return params
         
         try:
-            # Simple parameter parsing
-            param_dict = eval(f"dict({params_str})")
-            return param_dict
-        except:
+            # Parse as a call expression and only accept literal keyword values
+            tree = ast.parse(f"_f({params_str})", mode='eval')
+            return {kw.arg: ast.literal_eval(kw.value) for kw in tree.body.keywords if kw.arg}
+        except (SyntaxError, ValueError, TypeError):
             # Fallback parsing
-            param_pairs = [p.strip() for p in params_str.split(',')]
+            param_pairs = [p.strip() for p in _PARAM_SPLIT_RE.split(params_str)]
             for pair in param_pairs:
                 if '=' in pair:
                     key, value = pair.split('=', 1)
@@ -81,8 +522,8 @@ class BaseAgent:
                     # Try to parse lists and convert types
                     if value.startswith('[') and value.endswith(']'):
                         try:
-                            params[key] = eval(value)
-                        except:
+                            params[key] = ast.literal_eval(value)
+                        except (SyntaxError, ValueError):
                             params[key] = value
                     else:
                         params[key] = value
@@ -95,360 +536,461 @@ class BaseAgent:
             return {"error": f"Function '{function_name}' not found"}
         
         try:
+            kwargs = self._coerce_arguments(function_name, kwargs)
             result = self.tools[function_name](**kwargs)
-            self.history["calls"].append({
-                "function": function_name, 
-                "parameters": kwargs, 
-                "result": result,
-                "timestamp": datetime.now().isoformat()
-            })
-            return result
         except Exception as e:
-            error_result = {"error": f"Error executing {function_name}: {str(e)}"}
-            self.history["calls"].append({
-                "function": function_name, 
-                "parameters": kwargs, 
-                "error": error_result,
-                "timestamp": datetime.now().isoformat()
-            })
-            return error_result
+            return self._finish_call(function_name, kwargs, error=e)
+        # Recorded outside the try so a logging problem never turns a result into an error
+        return self._finish_call(function_name, kwargs, result=result)
+    
+    def _finish_call(self, function_name: str, kwargs: Dict[str, Any], result: Any = None,
+                     error: Optional[Exception] = None) -> Any:
+        """Record a finished function call; returns its result, or an error dict if it raised."""
+        if error is not None:
+            result = {"error": f"Error executing {function_name}: {str(error)}"}
+            self._record_call(function_name, kwargs, error=result)
+        else:
+            self._record_call(function_name, kwargs, result=result)
+        return result
+    
+    def _coerce_arguments(self, function_name: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert string arguments to the int or list types the tool declares."""
+        param_types = dict(self._tool_schema[function_name].params)
+        coerced = {}
+        for name, value in kwargs.items():
+            if isinstance(value, str):
+                if param_types.get(name) == "int" and value.strip().lstrip('-').isdigit():
+                    value = int(value)
+                elif param_types.get(name) == "List":
+                    value = [item for item in _CSV_SPLIT_RE.split(value.strip()) if item]
+            coerced[name] = value
+        return coerced
+    
+    def _record_call(self, function_name: str, parameters: Dict[str, Any], **outcome):
+        """Append a function call and its result or error to the history and the call log."""
+        call = {
+            "function": function_name, 
+            "parameters": parameters, 
+            **outcome,
+            "timestamp": time.time()
+        }
+        # Function calls run on worker threads, so count and log under a lock
+        with self._log_lock:
+            self.history["calls"].append(call)
+            self.history["call_count"] += 1
+            log = self._call_log()
+            if log is not None:
+                try:
+                    log.write(_dumps(call) + "\n")
+                except OSError:
+                    # The log file is best effort; the in-memory history has the call
+                    pass
+    
+    def _call_log(self):
+        """Open the agent's append-only call log on first use; None when logging is off."""
+        if self._log is None and AGENT_LOG_DIR is not None:
+            try:
+                os.makedirs(AGENT_LOG_DIR, exist_ok=True)
+                path = os.path.join(AGENT_LOG_DIR, re.sub(r'\W+', '_', self.name.lower()) + ".jsonl")
+                # Line buffered so the log survives a crash or Ctrl-C
+                self._log = open(path, 'a', encoding='utf-8', buffering=1)
+            except OSError:
+                return None
+        return self._log
+    
+    def history_as_iso(self) -> List[Dict]:
+        """Return the call history with epoch timestamps formatted as ISO strings."""
+        return [
+            {**call, "timestamp": datetime.fromtimestamp(call["timestamp"]).isoformat()}
+            for call in self.history["calls"]
+        ]
     
     def query(self, prompt: str, max_iterations: int = 3) -> str:
         """Query the agent with function calling capability."""
-        conversation_history = ""
-        current_message = prompt
+        run = _Query(self, prompt, max_iterations)
+        cached = run.cached()
+        if cached is not None:
+            return cached
+        if not self.tools:
+            # Nothing to call, so a single generation is the whole answer
+            try:
+                run.take_reply(self.model.generate_content(run.message).text, [], [])
+                return run.store()
+            except Exception as e:
+                return _generation_error(e)
+        
+        # The chat session carries earlier turns, so each iteration only sends what is new
+        chat = self.model.start_chat()
         
         for iteration in range(max_iterations):
-            full_prompt = f"""System: {self.system_prompt}
-
-Available Functions:
-{self._get_function_descriptions()}
-
-Instructions for function calling:
-- When you need to use a function, write: CALL_FUNCTION: function_name(param1="value1", param2=["item1", "item2"])
-- Use proper Python syntax for parameters
-- After calling functions, provide a comprehensive response
-
-{conversation_history}
-
-User: {current_message}"""
-            
             try:
-                response = self.model.generate_content(full_prompt)
-                response_text = response.text
-                self.history["responses"].append(response_text)
+                history = chat.history
+                function_calls, futures = [], []
+                try:
+                    # Function calls are started while the response is still streaming
+                    response_text = self._stream_turn(chat, run.message, function_calls, futures)
+                except Exception:
+                    # Retry the turn without streaming on a chat restored to the same history
+                    chat = self.model.start_chat(history=history)
+                    response_text = chat.send_message(run.message).text
+                    started = list(zip(function_calls, futures))
+                    function_calls = self._parse_function_calls(response_text)
+                    futures = self._resubmit_functions(function_calls, started)
                 
-                # Check for function calls
+                # Wait for the function calls started during the stream
+                results = [future.result() for future in futures]
+                if not run.take_reply(response_text, function_calls, results):
+                    return run.store()
+                    
+            except Exception as e:
+                return _generation_error(e)
+        
+        return _MAX_ITERATIONS_REACHED
+    
+    def _submit_function(self, call: Dict) -> Future:
+        """Start a parsed function call on the shared executor."""
+        return _EXECUTOR.submit(self._execute_function, call["function"], **call["parameters"])
+    
+    def _stream_turn(self, chat, message: str, function_calls: List[Dict], futures: List[Future]) -> str:
+        """Stream one chat turn, submitting each function call as soon as it is complete.
+        
+        Calls are appended to the given lists as they start, so a caller still
+        knows about them if the stream fails part way through.
+        """
+        response_text = ""
+        scanned = 0
+        
+        for chunk in chat.send_message(message, stream=True):
+            response_text += chunk.text
+            for call, scanned in self._iter_function_calls(response_text, scanned):
+                function_calls.append(call)
+                futures.append(self._submit_function(call))
+        
+        # A malformed directive stops the streaming scan; now that the text is
+        # complete, skip past it and start any calls that follow
+        for call, scanned in self._iter_function_calls(response_text, scanned, complete=True):
+            function_calls.append(call)
+            futures.append(self._submit_function(call))
+        
+        return response_text
+    
+    def _resubmit_functions(self, function_calls: List[Dict], started: List[tuple]) -> List[Future]:
+        """Futures for a retried turn's calls, reusing the ones a failed stream already started."""
+        futures = []
+        for call in function_calls:
+            match = next((i for i, (started_call, _) in enumerate(started) if started_call == call), None)
+            futures.append(self._submit_function(call) if match is None else started.pop(match)[1])
+        # Calls the retried turn no longer asks for are dropped if they have not run yet
+        for _, future in started:
+            future.cancel()
+        return futures
+    
+    async def _execute_function_async(self, function_name: str, **kwargs) -> Any:
+        """Execute a function without blocking the event loop."""
+        run_async = getattr(self.tools.get(function_name), "run_async", None)
+        if run_async is None:
+            # Plain synchronous tools run in a worker thread so several calls can overlap
+            return await BATCH_CLIENT.submit(asyncio.to_thread, self._execute_function, function_name, **kwargs)
+        
+        try:
+            kwargs = self._coerce_arguments(function_name, kwargs)
+            result = await run_async(**kwargs)
+        except Exception as e:
+            return self._finish_call(function_name, kwargs, error=e)
+        return self._finish_call(function_name, kwargs, result=result)
+    
+    async def query_async(self, prompt: str, max_iterations: int = 3) -> str:
+        """Async variant of query that runs all function calls of an iteration concurrently."""
+        run = _Query(self, prompt, max_iterations)
+        # Disk cache I/O runs in a worker thread so other agents keep going
+        cached = await asyncio.to_thread(run.cached)
+        if cached is not None:
+            return cached
+        if not self.tools:
+            # Nothing to call, so a single generation is the whole answer
+            try:
+                response = await BATCH_CLIENT.submit(self.model.generate_content_async, run.message)
+                run.take_reply(response.text, [], [])
+                return await asyncio.to_thread(run.store)
+            except Exception as e:
+                return _generation_error(e)
+        
+        # The chat session carries earlier turns, so each iteration only sends what is new
+        chat = self.model.start_chat()
+        
+        for iteration in range(max_iterations):
+            try:
+                response_text = (await BATCH_CLIENT.submit(chat.send_message_async, run.message)).text
                 function_calls = self._parse_function_calls(response_text)
                 
-                if function_calls:
-                    # Execute function calls
-                    function_results = []
-                    for call in function_calls:
-                        result = self._execute_function(call["function"], **call["parameters"])
-                        function_results.append(f"Function {call['function']} returned: {json.dumps(result, indent=2) if isinstance(result, (dict, list)) else str(result)}")
-                    
-                    # Add to conversation history for next iteration
-                    conversation_history += f"\nAssistant: {response_text}\n"
-                    conversation_history += f"Function Results:\n" + "\n".join(function_results) + "\n"
-                    current_message = "Based on the function results above, provide a comprehensive response to the original request."
-                    
-                    continue
-                else:
-                    return response_text
+                # Execute all function calls of this iteration concurrently
+                results = await asyncio.gather(*[
+                    self._execute_function_async(call["function"], **call["parameters"])
+                    for call in function_calls
+                ])
+                if not run.take_reply(response_text, function_calls, results):
+                    return await asyncio.to_thread(run.store)
                     
             except Exception as e:
-                return f"Error generating response: {str(e)}"
+                return _generation_error(e)
         
-        return "Maximum iterations reached. Please try a simpler request."
+        return _MAX_ITERATIONS_REACHED
+    
+    def _format_function_result(self, function_name: str, result: Any) -> str:
+        """Render a function result for inclusion in the next prompt."""
+        # Compact JSON; indentation only adds tokens the model has to read
+        rendered = _dumps(result) if isinstance(result, (dict, list)) else str(result)
+        if len(rendered) > _MAX_FUNCTION_RESULT_CHARS:
+            rendered = rendered[:_MAX_FUNCTION_RESULT_CHARS] + "...[truncated]"
+        return f"Function {function_name} returned: {rendered}"
     
     def _get_function_descriptions(self) -> str:
         """Get descriptions of available functions."""
-        descriptions = []
-        for name, func in self.tools.items():
-            doc = func.__doc__ or "No description available"
-            sig = inspect.signature(func)
-            params = []
-            for param_name, param in sig.parameters.items():
-                param_type = getattr(param.annotation, '__name__', str(param.annotation)) if param.annotation != param.empty else "any"
-                params.append(f"{param_name}: {param_type}")
-            
-            descriptions.append(f"Function: {name}({', '.join(params)})\nDescription: {doc}")
-        
-        return "\n\n".join(descriptions)
+        return self._function_descriptions
 
 # ======================
 # INTELLIGENT ANALYSIS TOOLS
 # ======================
 
-def analyze_weather_and_seasons(location: str, travel_month: str) -> Dict:
-    """Analyze weather and seasonal conditions for a location using AI knowledge."""
-    prompt = f"""Analyze the weather and travel conditions for {location} in {travel_month}.
+# Terse prompts; the response fields come from RESPONSE_SCHEMAS, and every
+# extra input token adds prefill latency
+PROMPT_TEMPLATES = {
+    "weather_analysis": """Travel weather brief.
+Location: {location}
+Month: {travel_month}""",
+    "date_recommendation": """Best months to visit.
+Location: {location}
+Window: next {flexible_window_months} months
+Weigh weather, crowds, prices, festivals, seasonal attractions, travel costs, natural phenomena.
+Rank the months best to worst with a reason for each.""",
+    "flight_search": """Flight advice.
+Route: {origin} -> {destination}
+Date: {travel_date}
+Budget: {budget_range}""",
+    "accommodation_search": """Accommodation advice.
+Location: {location}
+Dates: {dates}
+Type: {accommodation_type}
+Budget: {budget_range}""",
+    "transport_analysis": """Local transport guide for tourists.
+Location: {location}
+Time preference: {time_preference}""",
+    "route_optimization": """Day-by-day itinerary, minimize travel time between stops.
+Location: {location}
+Days: {duration_days}
+Interests: {interests}
+Time preference: {time_preference}""",
+    "attractions_search": """Attractions for a {duration_days}-day trip.
+Location: {location}
+Interests: {interests}""",
+    "events_search": """Local events and culture.
+Location: {location}
+Dates: {dates}
+Interests: {interests}""",
+}
 
-Consider:
-1. Typical temperature ranges
-2. Rainfall patterns
-3. Tourist seasons (high/low)
-4. Special weather phenomena
-5. Best activities for that time
-6. What to pack
-7. Any weather-related travel advisories
+# Tool responses are JSON with no prose around them; temperature 0 keeps the
+# structured lookups reproducible, which also lets them use the disk cache
+_JSON_OUTPUT = {"response_mime_type": "application/json", "temperature": 0}
 
-Provide practical advice for travelers visiting {location} in {travel_month}."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        # Parse the response into structured data
-        analysis_text = response.text
-        
-        return {
-            "location": location,
-            "month": travel_month,
-            "analysis": analysis_text,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Weather analysis failed: {str(e)}"}
+class WeatherOut(TypedDict):
+    temp_range: str
+    rainfall: str
+    tourist_season: str
+    phenomena: str
+    activities: str
+    packing: str
+    advisories: str
 
-def recommend_best_travel_dates(location: str, flexible_window_months: int = 6) -> Dict:
-    """Recommend the best times to visit a location throughout the year."""
-    prompt = f"""As a travel expert, recommend the best times to visit {location} within the next {flexible_window_months} months.
+class MonthRanking(TypedDict):
+    month: str
+    reason: str
 
-Consider:
-1. Weather conditions
-2. Tourist crowds and prices
-3. Local festivals and events
-4. Seasonal attractions
-5. Travel costs (flights, accommodation)
-6. Natural phenomena (cherry blossoms, northern lights, etc.)
+class DateRecommendationOut(TypedDict):
+    months: List[MonthRanking]
 
-Rank the months from best to worst for travel, explaining your reasoning for each ranking."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "recommendations": response.text,
-            "analysis_date": datetime.now().strftime("%Y-%m-%d"),
-            "window_months": flexible_window_months
-        }
-    except Exception as e:
-        return {"error": f"Date recommendation failed: {str(e)}"}
+class FlightOut(TypedDict):
+    duration_and_routes: str
+    airlines: str
+    price_range: str
+    booking_strategy: str
+    alternative_airports: str
+    layovers: str
+    peak_pricing_factors: str
+    deal_tips: str
 
-def find_flight_options(origin: str, destination: str, travel_date: str, budget_range: str) -> Dict:
-    """Find flight options and provide realistic travel advice."""
-    prompt = f"""As a travel booking expert, provide comprehensive flight information for:
-- Route: {origin} to {destination}
-- Date: {travel_date}
-- Budget: {budget_range}
+class AccommodationOut(TypedDict):
+    neighborhoods: str
+    price_range: str
+    types_and_brands: str
+    booking_platforms: str
+    amenities: str
+    safety: str
+    transport_access: str
+    deal_tips: str
 
-Include:
-1. Typical flight duration and routes
-2. Major airlines that serve this route
-3. Expected price ranges for {budget_range} budget
-4. Best booking strategies and timing
-5. Alternative airports to consider
-6. Layover cities and connection options
-7. Peak vs off-peak pricing factors
-8. Tips for finding deals
+class TransportOut(TypedDict):
+    public_transport: str
+    traffic_patterns: str
+    getting_around: str
+    costs_and_payment: str
+    rush_hours: str
+    walkability: str
+    taxi_rideshare: str
+    apps: str
+    safety: str
 
-Provide realistic, current market insights."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "route": f"{origin} → {destination}",
-            "date": travel_date,
-            "budget": budget_range,
-            "flight_analysis": response.text,
-            "search_timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Flight search failed: {str(e)}"}
+class ItineraryDay(TypedDict):
+    day: int
+    morning: str
+    afternoon: str
+    evening: str
+    transport: str
+    meals: str
+    rest: str
 
-def find_accommodation_options(location: str, dates: List[str], accommodation_type: str, budget_range: str) -> Dict:
-    """Find accommodation options with expert insights."""
-    prompt = f"""As a travel accommodation expert, provide detailed advice for staying in {location}:
+class RouteOut(TypedDict):
+    days: List[ItineraryDay]
+    alternatives: str
+    estimated_costs: str
+    booking_requirements: str
+    insider_tips: str
 
-Details:
-- Location: {location}
-- Dates: {', '.join(dates)}
-- Type: {accommodation_type}
-- Budget: {budget_range}
+class Attraction(TypedDict):
+    name: str
+    interest: str
+    hours: str
+    best_time: str
+    visit_duration: str
+    fees_and_booking: str
+    seasonal_notes: str
+    tips: str
+    nearby_food: str
+    accessibility: str
+    avoiding_crowds: str
 
-Include:
-1. Best neighborhoods to stay in
-2. Typical prices for {budget_range} budget
-3. Recommended accommodation types and brands
-4. Booking platforms and strategies
-5. What amenities to expect
-6. Safety and location considerations
-7. Transportation access from different areas
-8. Local tips for finding deals
+class AttractionsOut(TypedDict):
+    attractions: List[Attraction]
+    hidden_gems: str
 
-Provide practical, actionable accommodation advice."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "dates": dates,
-            "accommodation_type": accommodation_type,
-            "budget": budget_range,
-            "accommodation_analysis": response.text,
-            "search_timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Accommodation search failed: {str(e)}"}
+class EventsOut(TypedDict):
+    festivals: str
+    performances: str
+    markets_and_food: str
+    art: str
+    music_and_nightlife: str
+    sports: str
+    traditional_celebrations: str
+    community_workshops: str
+    booking_and_costs: str
+    etiquette: str
 
-def get_traffic_and_transport_insights(location: str, time_preference: str) -> Dict:
-    """Get transportation and traffic insights for a destination."""
-    prompt = f"""As a local transportation expert for {location}, provide comprehensive transport information:
+# Structured-output schema Gemini must follow for each prompt template
+RESPONSE_SCHEMAS = {
+    "weather_analysis": WeatherOut,
+    "date_recommendation": DateRecommendationOut,
+    "flight_search": FlightOut,
+    "accommodation_search": AccommodationOut,
+    "transport_analysis": TransportOut,
+    "route_optimization": RouteOut,
+    "attractions_search": AttractionsOut,
+    "events_search": EventsOut,
+}
 
-Focus on:
-1. Public transportation systems (metro, buses, trains)
-2. Typical traffic patterns during {time_preference} time
-3. Best ways to get around the city
-4. Transportation costs and payment methods
-5. Rush hour patterns and timing
-6. Walkability of different areas
-7. Taxi/rideshare availability and costs
-8. Transportation apps and tools for travelers
-9. Safety considerations for different transport modes
+_GENERATION_CONFIGS = {
+    key: {**_JSON_OUTPUT, "response_schema": schema} for key, schema in RESPONSE_SCHEMAS.items()
+}
 
-Provide practical advice for tourists visiting {location}."""
-    
+def _render_prompt(key: str, params: Dict[str, Any]) -> str:
+    """Fill a prompt template, joining list parameters into comma separated text."""
+    values = {name: ", ".join(map(str, value)) if isinstance(value, (list, tuple)) else value
+              for name, value in params.items()}
+    return PROMPT_TEMPLATES[key].format(**values)
+
+def _parse_json_response(text: str) -> Any:
+    """Decode a structured response, keeping the raw text if it is not valid JSON."""
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "time_preference": time_preference,
-            "transport_analysis": response.text,
-            "analysis_timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Transport analysis failed: {str(e)}"}
+        return json.loads(text)
+    except ValueError:
+        return text
 
-def create_optimized_route(location: str, interests: List[str], duration_days: int, time_preference: str) -> Dict:
-    """Create an optimized travel route based on interests and time constraints."""
-    interests_str = ", ".join(interests)
-    
-    prompt = f"""As a local tour guide expert for {location}, create an optimized {duration_days}-day itinerary:
+def _run_gemini_tool(key: str, response_field: str, **params) -> Dict:
+    """Run a templated prompt through Gemini and wrap the response with its inputs."""
+    try:
+        prompt = _render_prompt(key, params)
+        response_text = _cached_generate(prompt, _GENERATION_CONFIGS[key])
+        return {**params, response_field: _parse_json_response(response_text), "timestamp": time.time()}
+    except Exception as e:
+        return {"error": f"{key.replace('_', ' ').capitalize()} failed: {str(e)}"}
 
-Requirements:
-- Duration: {duration_days} days
-- Interests: {interests_str}
-- Time preference: {time_preference} activities
-- Minimize travel time between locations
-- Maximize experiences within time constraints
-
-Create a detailed day-by-day itinerary including:
-1. Morning, afternoon, and evening activities
-2. Recommended timing for each activity
-3. Transportation between locations
-4. Meal recommendations that fit the schedule
-5. Rest periods and flexible time
-6. Alternative options in case of weather/closures
-7. Estimated costs and booking requirements
-8. Local insider tips
-
-Make it practical and executable for a real traveler."""
-    
+async def _run_gemini_tool_async(key: str, response_field: str, **params) -> Dict:
+    """Async variant of _run_gemini_tool that goes through the shared batch client."""
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "duration_days": duration_days,
-            "interests": interests,
-            "time_preference": time_preference,
-            "optimized_itinerary": response.text,
-            "created_timestamp": datetime.now().isoformat()
-        }
+        prompt = _render_prompt(key, params)
+        response_text = await BATCH_CLIENT.generate(prompt, _GENERATION_CONFIGS[key])
+        return {**params, response_field: _parse_json_response(response_text), "timestamp": time.time()}
     except Exception as e:
-        return {"error": f"Route optimization failed: {str(e)}"}
+        return {"error": f"{key.replace('_', ' ').capitalize()} failed: {str(e)}"}
 
-def find_attractions_and_activities(location: str, interests: List[str], duration_days: int) -> Dict:
-    """Find attractions and activities based on specific interests."""
-    interests_str = ", ".join(interests)
+def _gemini_tool(key: str, response_field: str):
+    """Turn a signature-only stub into a tool backed by PROMPT_TEMPLATES[key].
     
-    prompt = f"""As a local expert for {location}, recommend the best attractions and activities for someone interested in {interests_str}.
+    The stub's signature and docstring are kept for the function descriptions;
+    the returned tool also exposes ``run_async`` for the async agent path and
+    its response schema so descriptions can advertise the result fields.
+    """
+    def decorate(stub: Callable) -> Callable:
+        signature = inspect.signature(stub)
+        
+        def bind(args, kwargs) -> Dict[str, Any]:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound.arguments
+        
+        @functools.wraps(stub)
+        def tool(*args, **kwargs) -> Dict:
+            return _run_gemini_tool(key, response_field, **bind(args, kwargs))
+        
+        async def run_async(*args, **kwargs) -> Dict:
+            return await _run_gemini_tool_async(key, response_field, **bind(args, kwargs))
+        
+        tool.run_async = run_async
+        tool.response_field = response_field
+        tool.response_schema = RESPONSE_SCHEMAS[key]
+        return tool
+    return decorate
 
-For a {duration_days}-day trip, provide:
-1. Must-see attractions for each interest category
-2. Hidden gems and local favorites
-3. Opening hours and best times to visit
-4. Estimated visit duration for each attraction
-5. Entry fees and booking requirements
-6. Seasonal considerations
-7. Photography and experience tips
-8. Nearby restaurants and facilities
-9. Accessibility information
-10. How to avoid crowds
+@_gemini_tool("weather_analysis", "analysis")
+def analyze_weather_and_seasons(location: str, travel_month: str) -> Dict:
+    """Analyze weather and seasonal conditions for a location using AI knowledge."""
 
-Prioritize based on the visitor's interests and practical logistics."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "interests": interests,
-            "duration_days": duration_days,
-            "attractions_guide": response.text,
-            "search_timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Attractions search failed: {str(e)}"}
+@_gemini_tool("date_recommendation", "recommendations")
+def recommend_best_travel_dates(location: str, flexible_window_months: int = 6) -> Dict:
+    """Recommend the best times to visit a location throughout the year."""
 
-def find_local_events_and_culture(location: str, dates: List[str], interests: List[str]) -> Dict:
-    """Find local events, festivals, and cultural activities."""
-    interests_str = ", ".join(interests)
-    dates_str = ", ".join(dates)
-    
-    prompt = f"""As a local cultural expert for {location}, provide information about events and cultural activities during {dates_str}.
+@_gemini_tool("flight_search", "flight_analysis")
+def find_flight_options(origin: str, destination: str, travel_date: str, budget_range: str) -> Dict:
+    """Find flight options and provide realistic travel advice."""
 
-Focus on interests: {interests_str}
+@_gemini_tool("accommodation_search", "accommodation_analysis")
+def find_accommodation_options(location: str, dates: List[str], accommodation_type: str, budget_range: str) -> Dict:
+    """Find accommodation options with expert insights."""
 
-Include:
-1. Seasonal festivals and events
-2. Cultural performances and shows
-3. Local markets and food events
-4. Art exhibitions and galleries
-5. Music venues and nightlife
-6. Sports events and activities
-7. Religious or traditional celebrations
-8. Community events and workshops
-9. Booking information and costs
-10. Cultural etiquette and tips
-
-Provide both scheduled events and ongoing cultural experiences."""
-    
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        
-        return {
-            "location": location,
-            "dates": dates,
-            "interests": interests,
-            "events_and_culture": response.text,
-            "search_timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Events search failed: {str(e)}"}
+@_gemini_tool("transport_analysis", "transport_analysis")
+def get_traffic_and_transport_insights(location: str, time_preference: str) -> Dict:
+    """Get transportation and traffic insights for a destination."""
+
+@_gemini_tool("route_optimization", "optimized_itinerary")
+def create_optimized_route(location: str, interests: List[str], duration_days: int, time_preference: str) -> Dict:
+    """Create an optimized travel route based on interests and time constraints."""
+
+@_gemini_tool("attractions_search", "attractions_guide")
+def find_attractions_and_activities(location: str, interests: List[str], duration_days: int) -> Dict:
+    """Find attractions and activities based on specific interests."""
+
+@_gemini_tool("events_search", "events_and_culture")
+def find_local_events_and_culture(location: str, dates: List[str], interests: List[str]) -> Dict:
+    """Find local events, festivals, and cultural activities."""
 
 # ======================
 # SPECIALIZED AGENTS
@@ -498,6 +1040,89 @@ class AttractionsAgent(BaseAgent):
 # MAIN COORDINATOR
 # ======================
 
+def _split_json_sections(text: str, keys: tuple) -> List[str]:
+    """Split an agent's JSON answer into one display string per key.
+    
+    Answers that are not a JSON object are shown whole under the first key.
+    """
+    start, end = text.find('{'), text.rfind('}')
+    try:
+        data = json.loads(text[start:end + 1]) if start != -1 else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return [text] + ["(Covered in the section above.)"] * (len(keys) - 1)
+    
+    sections = []
+    for key in keys:
+        value = data.get(key, "")
+        sections.append(value if isinstance(value, str) else json.dumps(value, indent=2, ensure_ascii=False))
+    return sections
+
+def _fill_sections(parts: List[Future], keys: tuple, response: Future):
+    """Resolve the per-section futures of a merged request once its answer is in."""
+    for part, text in zip(parts, _split_json_sections(response.result(), keys)):
+        part.set_result(text)
+
+def _section_text(analysis: Any) -> str:
+    """Wait for a plan section that may still be in progress."""
+    return analysis.result() if isinstance(analysis, Future) else analysis
+
+def _ask_agent(agent: BaseAgent, prompt: str) -> str:
+    """Query an agent from a worker thread, turning failures into the section text."""
+    try:
+        return agent.query(prompt)
+    except Exception as e:
+        return f"Error generating response: {str(e)}"
+
+# Agent queries the coordinator runs at once; keeps bursts within Gemini rate limits
+_MAX_CONCURRENT_AGENT_QUERIES = 4
+
+def _prefetch(agent: BaseAgent, prompt: str) -> Future:
+    """Start an agent query while the user is still answering questions.
+    
+    Runs on a daemon thread, like the coordinator's fan-out, so quitting
+    during the questions does not wait for the query to finish.
+    """
+    future = Future()
+    threading.Thread(target=lambda: future.set_result(_ask_agent(agent, prompt)), daemon=True).start()
+    return future
+
+# Keywords that route a plan-modification question to an agent, matched as
+# substrings so "staying" or "seasonal" still count; one compiled pattern per agent
+_FLIGHT_KEYWORDS = re.compile(r"flight|airline|price|route")
+_HOTEL_KEYWORDS = re.compile(r"hotel|accommodation|stay|room")
+_TRANSPORT_KEYWORDS = re.compile(r"transport|route|itinerary|schedule")
+_ATTRACTION_KEYWORDS = re.compile(r"attraction|activity|event|culture")
+_WEATHER_KEYWORDS = re.compile(r"weather|climate|season|time")
+
+# Indexed by month number, so index 0 is unused
+_MONTH_NAMES = ("", "January", "February", "March", "April", "May", "June",
+                "July", "August", "September", "October", "November", "December")
+_SEASON_BY_MONTH = ("", "winter", "winter", "spring", "spring", "spring", "summer",
+                    "summer", "summer", "autumn", "autumn", "autumn", "winter")
+
+def _travel_month(date: str) -> Optional[int]:
+    """Month number of a YYYY-MM-DD date, or None if it does not parse."""
+    try:
+        return datetime.fromisoformat(date).month
+    except ValueError:
+        pass
+    try:
+        # Also accept dates without zero padding, e.g. 2025-6-15
+        return datetime.strptime(date, "%Y-%m-%d").month
+    except ValueError:
+        return None
+
+def _ask(prompt: str) -> str:
+    """Prompt on stdout and read one line of the answer from stdin.
+    
+    Unlike input(), end of input gives an empty answer instead of raising EOFError.
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    return sys.stdin.readline().rstrip("\n")
+
 class TravelPlannerCoordinator:
     def __init__(self):
         self.weather_agent = WeatherAgent()
@@ -505,6 +1130,9 @@ class TravelPlannerCoordinator:
         self.route_agent = RouteAgent()
         self.attractions_agent = AttractionsAgent()
         self.travel_request = TravelRequest()
+        # Queries started ahead of time, keyed by prompt
+        self._prefetched: Dict[str, Future] = {}
+        self._weather_future: Optional[Future] = None
         
     def start_conversation(self):
         """Start the interactive travel planning conversation."""
@@ -518,11 +1146,11 @@ class TravelPlannerCoordinator:
         print("Let's start with the basics:\n")
         
         # Get origin and destination
-        self.travel_request.from_location = input("📍 Where are you traveling FROM? (city, country): ").strip()
-        self.travel_request.to_location = input("📍 Where do you want to travel TO? (city, country): ").strip()
+        self.travel_request.from_location = _ask("📍 Where are you traveling FROM? (city, country): ").strip()
+        self.travel_request.to_location = _ask("📍 Where do you want to travel TO? (city, country): ").strip()
         
         # Ask about date flexibility
-        flexible = input("\n📅 Are your travel dates flexible? (yes/no): ").strip().lower()
+        flexible = _ask("\n📅 Are your travel dates flexible? (yes/no): ").strip().lower()
         self.travel_request.flexible_dates = flexible in ['yes', 'y', 'yeah', 'sure']
         
         if self.travel_request.flexible_dates:
@@ -543,33 +1171,31 @@ class TravelPlannerCoordinator:
         print(f"\n🏆 EXPERT RECOMMENDATIONS:\n{recommendations}\n")
         
         # Let user choose
-        month = input("Based on this analysis, which month sounds good to you? ").strip()
+        month = _ask("Based on this analysis, which month sounds good to you? ").strip()
         
         # Get specific date
-        dates = input(f"What specific dates in {month}? (YYYY-MM-DD, comma separated): ").strip()
+        dates = _ask(f"What specific dates in {month}? (YYYY-MM-DD, comma separated): ").strip()
         if dates:
-            self.travel_request.preferred_dates = [d.strip() for d in dates.split(',')]
+            self.travel_request.preferred_dates = _CSV_SPLIT_RE.split(dates)
         
         return self.gather_preferences()
     
     def handle_fixed_dates(self):
         """Handle fixed date scenario with weather analysis."""
-        dates = input("📅 What are your travel dates? (YYYY-MM-DD, comma separated): ").strip()
-        self.travel_request.preferred_dates = [d.strip() for d in dates.split(',')]
+        dates = _ask("📅 What are your travel dates? (YYYY-MM-DD, comma separated): ").strip()
+        self.travel_request.preferred_dates = _CSV_SPLIT_RE.split(dates)
         
-        # Analyze weather for selected dates
-        if self.travel_request.preferred_dates:
-            travel_month = self.travel_request.preferred_dates[0].split('-')[1]
-            month_names = ["", "January", "February", "March", "April", "May", "June", 
-                          "July", "August", "September", "October", "November", "December"]
-            month_name = month_names[int(travel_month)]
+        # Analyze weather for selected dates; skipped when the first date does not parse
+        month = _travel_month(self.travel_request.preferred_dates[0]) if self.travel_request.preferred_dates else None
+        if month is not None:
+            month_name = _MONTH_NAMES[month]
             
-            print("🌤️  Analyzing weather for your dates...")
-            weather_analysis = self.weather_agent.query(
+            # Runs while the user answers the preference questions
+            print("🌤️  Analyzing weather for your dates in the background...\n")
+            self._weather_future = _prefetch(
+                self.weather_agent,
                 f"Analyze the weather conditions for {self.travel_request.to_location} in {month_name}. What should travelers expect?"
             )
-            
-            print(f"\n🌡️  WEATHER ANALYSIS:\n{weather_analysis}\n")
         
         return self.gather_preferences()
     
@@ -578,29 +1204,39 @@ class TravelPlannerCoordinator:
         print("🎨 Now let's personalize your trip:\n")
         
         # Duration
-        duration = input("⏱️  How many days will you stay? ").strip()
+        duration = _ask("⏱️  How many days will you stay? ").strip()
         try:
             self.travel_request.duration_days = int(duration)
-        except:
+        except ValueError:
             self.travel_request.duration_days = 3
         
         # Time preference
-        time_pref = input("🌅 Do you prefer day activities, night activities, or mixed? (day/night/mixed): ").strip().lower()
+        time_pref = _ask("🌅 Do you prefer day activities, night activities, or mixed? (day/night/mixed): ").strip().lower()
         self.travel_request.time_preference = time_pref if time_pref in ['day', 'night', 'mixed'] else 'mixed'
         
         # Interests
         print("\n🎯 What are you interested in? (be specific - e.g., 'art museums, local food, historic architecture')")
-        interests = input("Your interests: ").strip()
-        self.travel_request.interests = [i.strip() for i in interests.split(',')]
+        interests = _ask("Your interests: ").strip()
+        self.travel_request.interests = _CSV_SPLIT_RE.split(interests)
         
         # Budget
-        budget = input("\n💰 What's your budget range? (low/medium/high): ").strip().lower()
+        budget = _ask("\n💰 What's your budget range? (low/medium/high): ").strip().lower()
         self.travel_request.budget_range = budget if budget in ['low', 'medium', 'high'] else 'medium'
         
+        # The flight search has everything it needs now, so start it while the
+        # remaining question is answered
+        if self.travel_request.preferred_dates:
+            flight_prompt = self._flight_prompt()
+            self._prefetched[flight_prompt] = _prefetch(self.booking_agent, flight_prompt)
+        
         # Accommodation
-        accom = input("🏨 Preferred accommodation type? (hotel/hostel/apartment/any): ").strip().lower()
+        accom = _ask("🏨 Preferred accommodation type? (hotel/hostel/apartment/any): ").strip().lower()
         self.travel_request.accommodation_type = accom if accom in ['hotel', 'hostel', 'apartment'] else 'hotel'
         
+        if self._weather_future is not None:
+            print(f"\n🌡️  WEATHER ANALYSIS:\n{self._weather_future.result()}\n")
+            self._weather_future = None
+        
         return self.create_comprehensive_plan()
     
     def create_comprehensive_plan(self):
@@ -608,52 +1244,111 @@ class TravelPlannerCoordinator:
         print("\n🚀 Creating your personalized travel plan...")
         print("My expert agents are analyzing your requirements...\n")
         
-        # 1. Flight Analysis
         print("✈️  Flight Expert analyzing routes and pricing...")
-        flight_analysis = self.booking_agent.query(
-            f"Find flight options from {self.travel_request.from_location} to {self.travel_request.to_location} "
-            f"for {self.travel_request.preferred_dates[0]} with {self.travel_request.budget_range} budget."
-        )
-        
-        # 2. Accommodation Analysis
         print("🏨 Accommodation Expert finding best places to stay...")
-        accommodation_analysis = self.booking_agent.query(
-            f"Find {self.travel_request.accommodation_type} accommodations in {self.travel_request.to_location} "
-            f"for dates {', '.join(self.travel_request.preferred_dates)} with {self.travel_request.budget_range} budget."
-        )
-        
-        # 3. Transportation & Route Analysis
         print("🗺️  Transportation Expert optimizing your routes...")
-        transport_analysis = self.route_agent.query(
-            f"Analyze transportation options in {self.travel_request.to_location} for {self.travel_request.time_preference} activities."
-        )
+        print("🎨 Attractions Expert finding perfect activities...")
         
-        route_optimization = self.route_agent.query(
-            f"Create an optimized {self.travel_request.duration_days}-day itinerary for {self.travel_request.to_location} "
-            f"focusing on {', '.join(self.travel_request.interests)} with {self.travel_request.time_preference} preference."
-        )
+        # The analyses are independent of each other, so run them concurrently and
+        # show each section as soon as it is ready instead of after the slowest one
+        requests = self._expert_requests()
+        # Requests started during the questions are not sent again
+        prefetched = {prompt: self._prefetched.pop(prompt) for _, prompt, _ in requests if prompt in self._prefetched}
+        pending = [request for request in requests if request[1] not in prefetched]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            started = [Future() for _ in pending]
+            threading.Thread(
+                target=asyncio.run, args=(self._gather_expert_analyses(pending, started),), daemon=True
+            ).start()
+        else:
+            # Already inside an event loop (e.g. a notebook), where asyncio.run is not allowed
+            started = self._fan_out_with_threads(pending)
+        started = iter(started)
+        responses = [prefetched[prompt] if prompt in prefetched else next(started) for _, prompt, _ in requests]
         
-        # 4. Attractions Analysis
-        print("🎨 Attractions Expert finding perfect activities...")
-        attractions_analysis = self.attractions_agent.query(
-            f"Find the best attractions and activities in {self.travel_request.to_location} for someone interested in "
-            f"{', '.join(self.travel_request.interests)} for a {self.travel_request.duration_days}-day trip."
-        )
+        # Merged requests answer several sections of the plan at once
+        analyses = []
+        for (agent, prompt, sections), response in zip(requests, responses):
+            if not sections:
+                analyses.append(response)
+                continue
+            parts = [Future() for _ in sections]
+            response.add_done_callback(functools.partial(_fill_sections, parts, sections))
+            analyses.extend(parts)
         
-        events_analysis = self.attractions_agent.query(
-            f"Find local events, festivals, and cultural activities in {self.travel_request.to_location} "
-            f"during {', '.join(self.travel_request.preferred_dates)} that match interests: {', '.join(self.travel_request.interests)}."
-        )
+        return self.present_comprehensive_plan(*analyses)
+    
+    def _expert_requests(self) -> List[tuple]:
+        """Return the (agent, prompt, JSON section keys) requests behind the plan, in display order.
         
-        return self.present_comprehensive_plan(
-            flight_analysis, accommodation_analysis, transport_analysis, 
-            route_optimization, attractions_analysis, events_analysis
-        )
+        Sections that share an agent and most of their context are asked for in
+        one request that answers with a JSON object holding both sections.
+        """
+        context = self.travel_request.context_blurb
+        return [
+            # 1. Flight Analysis
+            (self.booking_agent, self._flight_prompt(), None),
+            # 2. Accommodation Analysis
+            (self.booking_agent,
+             f"{context} Find {self.travel_request.accommodation_type} accommodations "
+             f"for dates {', '.join(self.travel_request.preferred_dates)}.",
+             None),
+            # 3. Transportation & Route Analysis
+            (self.route_agent,
+             f"{context} Return JSON with keys 'transport' and 'itinerary'. "
+             f"transport: transportation options at the destination for {self.travel_request.time_preference} activities. "
+             f"itinerary: an optimized day-by-day itinerary focusing on the interests "
+             f"with {self.travel_request.time_preference} preference.",
+             ("transport", "itinerary")),
+            # 4. Attractions Analysis
+            (self.attractions_agent,
+             f"{context} Return JSON with keys 'attractions' and 'events'. "
+             f"attractions: the best attractions and activities for these interests. "
+             f"events: local events, festivals, and cultural activities during {', '.join(self.travel_request.preferred_dates)} "
+             f"that match those interests.",
+             ("attractions", "events")),
+        ]
+    
+    def _flight_prompt(self) -> str:
+        """Prompt for the flight section, shared with the prefetch in gather_preferences."""
+        return f"{self.travel_request.context_blurb} Find flight options for {self.travel_request.preferred_dates[0]}."
+    
+    async def _gather_expert_analyses(self, requests: List[tuple], responses: List[Future]):
+        """Query the agents concurrently, resolving each request's future as it finishes."""
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_AGENT_QUERIES)
+        
+        async def ask(agent: BaseAgent, prompt: str, response: Future):
+            async with semaphore:
+                try:
+                    response.set_result(await agent.query_async(prompt))
+                except Exception as e:
+                    # One failed agent only affects its own section of the plan
+                    response.set_result(f"Error generating response: {str(e)}")
+        
+        await asyncio.gather(*[
+            ask(agent, prompt, response) for (agent, prompt, _), response in zip(requests, responses)
+        ])
+    
+    def _fan_out_with_threads(self, requests: List[tuple]) -> List[Future]:
+        """Start the blocking agent queries on a dedicated thread pool, one future per request."""
+        # Not the shared _EXECUTOR: agent.query submits its function calls there and
+        # waiting on them from inside the same pool could exhaust its workers
+        executor = ThreadPoolExecutor(max_workers=len(requests))
+        futures = [executor.submit(_ask_agent, agent, prompt) for agent, prompt, _ in requests]
+        # Queued queries still run; the pool's threads exit once they are done
+        executor.shutdown(wait=False)
+        return futures
     
     def present_comprehensive_plan(self, flight_analysis, accommodation_analysis, 
                                  transport_analysis, route_optimization, 
                                  attractions_analysis, events_analysis):
-        """Present the final comprehensive travel plan."""
+        """Present the final comprehensive travel plan.
+        
+        Analyses may be futures of sections still being generated; each is
+        printed as soon as it and every section before it are ready.
+        """
         print("\n" + "="*80)
         print("🎉 YOUR PERSONALIZED TRAVEL PLAN 🎉")
         print("="*80)
@@ -670,33 +1365,33 @@ class TravelPlannerCoordinator:
         # Expert Analyses
         print(f"\n✈️  FLIGHT EXPERT ANALYSIS:")
         print("─" * 40)
-        print(flight_analysis)
+        print(_section_text(flight_analysis))
         
         print(f"\n🏨 ACCOMMODATION EXPERT ANALYSIS:")
         print("─" * 40)
-        print(accommodation_analysis)
+        print(_section_text(accommodation_analysis))
         
         print(f"\n🚌 TRANSPORTATION EXPERT ANALYSIS:")
         print("─" * 40)
-        print(transport_analysis)
+        print(_section_text(transport_analysis))
         
         print(f"\n🗺️  OPTIMIZED ITINERARY:")
         print("─" * 40)
-        print(route_optimization)
+        print(_section_text(route_optimization))
         
         print(f"\n🎨 ATTRACTIONS & ACTIVITIES:")
         print("─" * 40)
-        print(attractions_analysis)
+        print(_section_text(attractions_analysis))
         
         print(f"\n🎉 LOCAL EVENTS & CULTURE:")
         print("─" * 40)
-        print(events_analysis)
+        print(_section_text(events_analysis))
         
         # Additional tips
         self.generate_final_tips()
         
         # Ask for modifications
-        modify = input(f"\n🤔 Would you like me to modify or expand any part of this plan? (yes/no): ").strip().lower()
+        modify = _ask(f"\n🤔 Would you like me to modify or expand any part of this plan? (yes/no): ").strip().lower()
         if modify in ['yes', 'y']:
             return self.handle_plan_modifications()
         else:
@@ -714,9 +1409,7 @@ class TravelPlannerCoordinator:
         communication, and cultural considerations."""
         
         try:
-            model = genai.GenerativeModel("gemini-2.5-flash")
-            tips = model.generate_content(tips_prompt)
-            print(tips.text)
+            _print_stream(_stream_generate(tips_prompt))
         except Exception as e:
             print("• Download offline maps and translation apps")
             print("• Check visa requirements and passport validity")
@@ -727,35 +1420,38 @@ class TravelPlannerCoordinator:
     def handle_plan_modifications(self):
         """Handle user requests for plan modifications."""
         print(f"\n🔧 What would you like me to modify or get more details about?")
-        modification_request = input("Tell me what you'd like to change or learn more about: ").strip()
+        modification_request = _ask("Tell me what you'd like to change or learn more about: ").strip()
         
         if modification_request:
             print(f"\n🔄 Let me get more specific information...")
             
             # Route the request to the most appropriate agent
-            if any(word in modification_request.lower() for word in ['flight', 'airline', 'price', 'route']):
-                response = self.booking_agent.query(f"Regarding travel from {self.travel_request.from_location} to {self.travel_request.to_location}: {modification_request}")
-            elif any(word in modification_request.lower() for word in ['hotel', 'accommodation', 'stay', 'room']):
-                response = self.booking_agent.query(f"Regarding accommodation in {self.travel_request.to_location}: {modification_request}")
-            elif any(word in modification_request.lower() for word in ['transport', 'route', 'itinerary', 'schedule']):
-                response = self.route_agent.query(f"Regarding transportation and routes in {self.travel_request.to_location}: {modification_request}")
-            elif any(word in modification_request.lower() for word in ['attraction', 'activity', 'event', 'culture']):
-                response = self.attractions_agent.query(f"Regarding attractions and activities in {self.travel_request.to_location}: {modification_request}")
-            elif any(word in modification_request.lower() for word in ['weather', 'climate', 'season', 'time']):
-                response = self.weather_agent.query(f"Regarding weather and timing for {self.travel_request.to_location}: {modification_request}")
+            lowered = modification_request.lower()
+            context = self.travel_request.context_blurb
+            if _FLIGHT_KEYWORDS.search(lowered):
+                response = self.booking_agent.query(f"{context} Regarding travel: {modification_request}")
+            elif _HOTEL_KEYWORDS.search(lowered):
+                response = self.booking_agent.query(f"{context} Regarding accommodation: {modification_request}")
+            elif _TRANSPORT_KEYWORDS.search(lowered):
+                response = self.route_agent.query(f"{context} Regarding transportation and routes: {modification_request}")
+            elif _ATTRACTION_KEYWORDS.search(lowered):
+                response = self.attractions_agent.query(f"{context} Regarding attractions and activities: {modification_request}")
+            elif _WEATHER_KEYWORDS.search(lowered):
+                response = self.weather_agent.query(f"{context} Regarding weather and timing: {modification_request}")
             else:
                 # General query - use the most appropriate agent or coordinate
-                response = f"Let me address your question: {modification_request}"
-                model = genai.GenerativeModel("gemini-2.5-flash")
-                response = model.generate_content(f"As a travel expert, please answer this question about traveling to {self.travel_request.to_location}: {modification_request}")
-                response = response.text
+                response = _stream_generate(f"{context} As a travel expert, please answer this question about the trip: {modification_request}")
             
             print(f"\n📝 UPDATED INFORMATION:")
             print("─" * 40)
-            print(response)
+            if isinstance(response, str):
+                print(response)
+            else:
+                # Print the general answer as it is generated
+                _print_stream(response)
             
             # Ask if they want more changes
-            more_changes = input(f"\n🔄 Any other modifications needed? (yes/no): ").strip().lower()
+            more_changes = _ask(f"\n🔄 Any other modifications needed? (yes/no): ").strip().lower()
             if more_changes in ['yes', 'y']:
                 return self.handle_plan_modifications()
         
@@ -772,24 +1468,27 @@ def save_travel_plan(travel_request: TravelRequest, plan_content: str):
     
     try:
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("🌍 AI TRAVEL PLANNER - PERSONALIZED ITINERARY 🌍\n")
-            f.write("="*60 + "\n\n")
-            
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            
-            f.write("TRIP DETAILS:\n")
-            f.write(f"From: {travel_request.from_location}\n")
-            f.write(f"To: {travel_request.to_location}\n")
-            f.write(f"Dates: {', '.join(travel_request.preferred_dates or ['TBD'])}\n")
-            f.write(f"Duration: {travel_request.duration_days} days\n")
-            f.write(f"Budget: {travel_request.budget_range}\n")
-            f.write(f"Accommodation: {travel_request.accommodation_type}\n")
-            f.write(f"Interests: {', '.join(travel_request.interests or [])}\n")
-            f.write(f"Time preference: {travel_request.time_preference}\n\n")
-            
-            f.write("DETAILED PLAN:\n")
-            f.write("="*40 + "\n")
-            f.write(plan_content)
+            # Build the file once; writelines would still call write per line
+            f.write("".join([
+                "🌍 AI TRAVEL PLANNER - PERSONALIZED ITINERARY 🌍\n",
+                "="*60 + "\n\n",
+                
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+                
+                "TRIP DETAILS:\n",
+                f"From: {travel_request.from_location}\n",
+                f"To: {travel_request.to_location}\n",
+                f"Dates: {', '.join(travel_request.preferred_dates or ['TBD'])}\n",
+                f"Duration: {travel_request.duration_days} days\n",
+                f"Budget: {travel_request.budget_range}\n",
+                f"Accommodation: {travel_request.accommodation_type}\n",
+                f"Interests: {', '.join(travel_request.interests or [])}\n",
+                f"Time preference: {travel_request.time_preference}\n\n",
+                
+                "DETAILED PLAN:\n",
+                "="*40 + "\n",
+                plan_content,
+            ]))
         
         print(f"\n💾 Travel plan saved to: {filename}")
         return filename
@@ -798,8 +1497,13 @@ def save_travel_plan(travel_request: TravelRequest, plan_content: str):
         print(f"❌ Error saving travel plan: {str(e)}")
         return None
 
-def get_travel_checklist(destination: str, duration_days: int, season: str) -> str:
-    """Generate a travel checklist."""
+# Checklists and budgets depend on a handful of trip details, so repeats within a
+# session are answered from memory; errors raise and are never cached
+_SESSION_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=_SESSION_CACHE_SIZE)
+def _checklist_impl(destination: str, duration_days: int, season: str) -> str:
+    """Generate the checklist text for a trip."""
     prompt = f"""Create a comprehensive travel checklist for a {duration_days}-day trip to {destination} during {season}.
 
 Include:
@@ -813,23 +1517,27 @@ Include:
 
 Make it practical and actionable."""
     
+    return _cached_generate(prompt)
+
+def get_travel_checklist(destination: str, duration_days: int, season: str) -> str:
+    """Generate a travel checklist."""
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        return _checklist_impl(destination, duration_days, season)
     except Exception as e:
         return f"Error generating checklist: {str(e)}"
 
-def estimate_total_budget(travel_request: TravelRequest, expert_analyses: Dict) -> str:
-    """Estimate total travel budget based on expert analyses."""
+@functools.lru_cache(maxsize=_SESSION_CACHE_SIZE)
+def _budget_impl(from_location: str, to_location: str, duration_days: int,
+                 budget_range: str, accommodation_type: str, interests: tuple) -> str:
+    """Generate the budget estimate text for a trip."""
     prompt = f"""As a travel budget expert, estimate the total cost for this trip:
 
 Trip Details:
-- Destination: {travel_request.from_location} to {travel_request.to_location}
-- Duration: {travel_request.duration_days} days
-- Budget range: {travel_request.budget_range}
-- Accommodation: {travel_request.accommodation_type}
-- Interests: {', '.join(travel_request.interests or [])}
+- Destination: {from_location} to {to_location}
+- Duration: {duration_days} days
+- Budget range: {budget_range}
+- Accommodation: {accommodation_type}
+- Interests: {', '.join(interests)}
 
 Provide:
 1. Flight cost estimates
@@ -843,10 +1551,15 @@ Provide:
 
 Give realistic price ranges in USD."""
     
+    return _cached_generate(prompt)
+
+def estimate_total_budget(travel_request: TravelRequest, expert_analyses: Dict) -> str:
+    """Estimate total travel budget based on expert analyses."""
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        return response.text
+        return _budget_impl(
+            travel_request.from_location, travel_request.to_location, travel_request.duration_days,
+            travel_request.budget_range, travel_request.accommodation_type, tuple(travel_request.interests or ())
+        )
     except Exception as e:
         return f"Error estimating budget: {str(e)}"
 
@@ -870,7 +1583,7 @@ def main():
             print("─" * 30)
             
             # Travel checklist
-            checklist_request = input("📋 Would you like a personalized travel checklist? (yes/no): ").strip().lower()
+            checklist_request = _ask("📋 Would you like a personalized travel checklist? (yes/no): ").strip().lower()
             if checklist_request in ['yes', 'y']:
                 print("\n📋 TRAVEL CHECKLIST:")
                 print("─" * 30)
@@ -878,18 +1591,9 @@ def main():
                 # Determine season from dates
                 season = "current season"  # Default
                 if coordinator.travel_request.preferred_dates:
-                    try:
-                        month = int(coordinator.travel_request.preferred_dates[0].split('-')[1])
-                        if month in [12, 1, 2]:
-                            season = "winter"
-                        elif month in [3, 4, 5]:
-                            season = "spring"
-                        elif month in [6, 7, 8]:
-                            season = "summer"
-                        else:
-                            season = "autumn"
-                    except:
-                        pass
+                    month = _travel_month(coordinator.travel_request.preferred_dates[0])
+                    if month is not None:
+                        season = _SEASON_BY_MONTH[month]
                 
                 checklist = get_travel_checklist(
                     coordinator.travel_request.to_location, 
@@ -899,7 +1603,7 @@ def main():
                 print(checklist)
             
             # Budget estimate
-            budget_request = input(f"\n💰 Would you like a detailed budget breakdown? (yes/no): ").strip().lower()
+            budget_request = _ask(f"\n💰 Would you like a detailed budget breakdown? (yes/no): ").strip().lower()
             if budget_request in ['yes', 'y']:
                 print("\n💰 BUDGET BREAKDOWN:")
                 print("─" * 30)
@@ -908,18 +1612,18 @@ def main():
                 print(budget_analysis)
             
             # Save plan option
-            save_request = input(f"\n💾 Would you like to save your travel plan to a file? (yes/no): ").strip().lower()
+            save_request = _ask(f"\n💾 Would you like to save your travel plan to a file? (yes/no): ").strip().lower()
             if save_request in ['yes', 'y']:
                 # Compile all information into a comprehensive plan
                 plan_content = f"""
 TRAVEL REQUEST SUMMARY:
-{coordinator.travel_request.__dict__}
+{json.dumps(asdict(coordinator.travel_request), indent=2, ensure_ascii=False)}
 
 AGENT CONSULTATION HISTORY:
-Weather Agent Calls: {len(coordinator.weather_agent.history['calls'])}
-Booking Agent Calls: {len(coordinator.booking_agent.history['calls'])}
-Route Agent Calls: {len(coordinator.route_agent.history['calls'])}
-Attractions Agent Calls: {len(coordinator.attractions_agent.history['calls'])}
+Weather Agent Calls: {coordinator.weather_agent.history['call_count']}
+Booking Agent Calls: {coordinator.booking_agent.history['call_count']}
+Route Agent Calls: {coordinator.route_agent.history['call_count']}
+Attractions Agent Calls: {coordinator.attractions_agent.history['call_count']}
 
 Generated by AI Travel Planner on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """